@@ -0,0 +1,131 @@
+import asyncio
+import time
+from contextvars import ContextVar
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+
+# concurrent requests per worker in each lane; the sum stays below the engine's pool size
+# (5 + 10 overflow), so a request that got a slot rarely waits for a connection
+LANES = {
+    'catalog': 8,
+    'write': 4,
+    'auth': 2,
+}
+
+# time budget of a request in each lane, the middleware cancels the request when it runs out
+# and every SQL statement is capped by what is left of it
+DEADLINES = {
+    'catalog': 3.0,
+    'write': 10.0,
+    'auth': 5.0,
+}
+
+# statement_timeout is set again once the remaining budget is this much below the one applied
+TIMEOUT_SLACK_MS = 50
+
+# how long a request may queue for a slot before it is shed
+MAX_QUEUE_WAIT = 1.0
+RETRY_AFTER = 1
+
+QUERY_CANCELED = '57014'
+
+# POST endpoints that only read the catalog
+CATALOG_POSTS = {'/products/batch'}
+
+
+
+class RequestBudget:
+    """Deadline of an admitted request. `active` drops when the request ends, so tasks that
+    copied the request's context don't inherit its deadline."""
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self.active = True
+
+
+request_budget: ContextVar[RequestBudget | None] = ContextVar('request_budget', default=None)
+
+
+def classify(method: str, path: str) -> str:
+    if path.startswith('/auth/token') or (path.rstrip('/') == '/auth' and method == 'POST'):
+        return 'auth'
+    if method in ('GET', 'HEAD') or path in CATALOG_POSTS:
+        return 'catalog'
+    return 'write'
+
+
+def overloaded_response() -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={'detail': 'Service is overloaded, try again later'},
+        headers={'Retry-After': str(RETRY_AFTER)}
+    )
+
+
+class AdmissionMiddleware:
+    """Sheds requests with 503 when their lane is saturated or their deadline runs out."""
+
+    def __init__(self, app):
+        self.app = app
+        self.lanes = {lane: asyncio.Semaphore(limit) for lane, limit in LANES.items()}
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        lane = classify(scope['method'], scope['path'])
+        semaphore = self.lanes[lane]
+        try:
+            await asyncio.wait_for(semaphore.acquire(), MAX_QUEUE_WAIT)
+        except asyncio.TimeoutError:
+            return await overloaded_response()(scope, receive, send)
+
+        budget = RequestBudget(time.monotonic() + DEADLINES[lane])
+        token = request_budget.set(budget)
+        response_started = False
+
+        async def send_tracked(message):
+            nonlocal response_started
+            response_started = response_started or message['type'] == 'http.response.start'
+            await send(message)
+
+        try:
+            async with asyncio.timeout(DEADLINES[lane]):
+                await self.app(scope, receive, send_tracked)
+        except asyncio.TimeoutError:
+            if response_started:
+                raise
+            await overloaded_response()(scope, receive, send)
+        finally:
+            budget.active = False
+            request_budget.reset(token)
+            semaphore.release()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def apply_statement_timeout(conn, cursor, statement, parameters, context, executemany):
+    budget = request_budget.get()
+    if budget is None or not budget.active or conn.dialect.name != 'postgresql':
+        return
+    timeout = max(int((budget.deadline - time.monotonic()) * 1000), 1)
+    # SET LOCAL lasts until the transaction ends, within one it only has to shrink
+    transaction = conn.get_transaction()
+    applied = conn.info.get('statement_timeout')
+    if applied is not None and applied[0] is transaction and applied[1] - timeout < TIMEOUT_SLACK_MS:
+        return
+    cursor.execute(f'SET LOCAL statement_timeout = {timeout}')
+    conn.info['statement_timeout'] = (transaction, timeout)
+
+
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError) -> JSONResponse:
+    return overloaded_response()
+
+
+async def db_error_handler(request: Request, exc: DBAPIError) -> JSONResponse:
+    if getattr(exc.orig, 'pgcode', None) == QUERY_CANCELED:
+        return overloaded_response()
+    raise exc
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+
+from sqlalchemy import select, insert, delete, func, distinct
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.backend.db import async_session_maker, visibility_horizon
+from app.models import Product, SupplierCategoryStats, AnalyticsRefresh
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL = 60
+# pg advisory lock id, only one worker refreshes at a time
+REFRESH_LOCK = 330033
+
+
+def _stats_query():
+    return (select(Product.supplier_id,
+                   Product.category_id,
+                   func.count(Product.id),
+                   func.coalesce(func.sum(Product.stock), 0),
+                   func.count(Product.id).filter(Product.stock <= 0),
+                   func.avg(Product.rating))
+            .where(Product.is_active == True, Product.supplier_id.is_not(None), Product.category_id.is_not(None))
+            .group_by(Product.supplier_id, Product.category_id))
+
+
+async def refresh_supplier_stats(db: AsyncSession) -> bool:
+    """Recompute the summary rows of suppliers whose products changed since the last run.
+
+    The first run rebuilds everything. Returns False if another worker holds the refresh lock.
+    """
+    if not await db.scalar(select(func.pg_try_advisory_xact_lock(REFRESH_LOCK))):
+        return False
+
+    state = await db.scalar(select(AnalyticsRefresh).where(AnalyticsRefresh.id == 1))
+    if state is None:
+        state = AnalyticsRefresh(id=1)
+        db.add(state)
+    now = await db.scalar(select(func.now()))
+    # same as the change feed: changes of transactions that are still open wait for the next run
+    watermark = await db.scalar(visibility_horizon())
+
+    query = _stats_query()
+    if state.watermark is None:
+        await db.execute(delete(SupplierCategoryStats))
+    else:
+        suppliers = await db.scalars(
+            select(distinct(Product.supplier_id))
+            .where(Product.updated_at >= state.watermark, Product.updated_at < watermark))
+        suppliers = suppliers.all()
+        await db.execute(delete(SupplierCategoryStats).where(SupplierCategoryStats.supplier_id.in_(suppliers)))
+        query = query.where(Product.supplier_id.in_(suppliers))
+
+    await db.execute(insert(SupplierCategoryStats).from_select(
+        ['supplier_id', 'category_id', 'product_count', 'stock_total', 'out_of_stock_count', 'avg_rating'], query))
+    state.watermark = watermark
+    state.refreshed_at = now
+    await db.commit()
+    return True
+
+
+async def refresh_loop() -> None:
+    while True:
+        try:
+            async with async_session_maker() as db:
+                await refresh_supplier_stats(db)
+        except Exception:
+            logger.exception('Supplier stats refresh failed')
+        await asyncio.sleep(REFRESH_INTERVAL)
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+from sqlalchemy import select, insert, delete, update, func, exists
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncConnection
+
+from app.backend.db import engine, async_session_maker
+from app.models import Product, Category, ProductArchive, CategoryArchive, ArchiveRun
+
+logger = logging.getLogger(__name__)
+
+# soft-deleted rows younger than this stay in the hot tables
+RETENTION = timedelta(days=30)
+BATCH_SIZE = 500
+# pause between batches, keeps the job from hogging the pool and the WAL
+BATCH_PAUSE = 0.5
+# pg advisory lock id, held for the whole run so only one runs across all workers
+ARCHIVE_LOCK = 330034
+
+PRODUCT_COLUMNS = [column.name for column in Product.__table__.columns]
+CATEGORY_COLUMNS = [column.name for column in Category.__table__.columns]
+
+child_category = Category.__table__.alias('child_category')
+
+
+async def _move_batch(db: AsyncSession, model, archive_model, columns: list[str], *criteria) -> int:
+    ids = await db.scalars(
+        select(model.id)
+        .where(model.is_active == False, model.updated_at < func.now() - RETENTION, *criteria)
+        .order_by(model.id).limit(BATCH_SIZE)
+        .with_for_update(skip_locked=True))
+    ids = ids.all()
+    if ids:
+        await db.execute(insert(archive_model).from_select(
+            columns, select(*[model.__table__.c[column] for column in columns]).where(model.id.in_(ids))))
+        await db.execute(delete(model).where(model.id.in_(ids)))
+    return len(ids)
+
+
+async def archive_products_batch(db: AsyncSession) -> int:
+    return await _move_batch(db, Product, ProductArchive, PRODUCT_COLUMNS)
+
+
+async def archive_categories_batch(db: AsyncSession) -> int:
+    # a category is kept while any product, archived or not, or any child category points at it
+    return await _move_batch(
+        db, Category, CategoryArchive, CATEGORY_COLUMNS,
+        ~exists().where(Product.category_id == Category.id),
+        ~exists().where(ProductArchive.category_id == Category.id),
+        ~exists().where(child_category.c.parent_id == Category.id))
+
+
+async def claim_run() -> tuple[int, AsyncConnection] | None:
+    """Take the archive lock and create the `archive_runs` row of a new run.
+
+    The lock is held by a connection of its own, so it covers every worker and goes away
+    with the connection if the worker dies. Returns None if another run holds it, otherwise
+    the run id and the connection, which `run_archive` takes over.
+    """
+    conn = await engine.connect()
+    try:
+        if not await conn.scalar(select(func.pg_try_advisory_lock(ARCHIVE_LOCK))):
+            await conn.close()
+            return None
+        run_id = await conn.scalar(insert(ArchiveRun).values(products_archived=0, categories_archived=0)
+                                   .returning(ArchiveRun.id))
+        await conn.commit()
+    except BaseException:
+        await _release(conn)
+        raise
+    return run_id, conn
+
+
+async def run_archive(run_id: int, conn: AsyncConnection) -> None:
+    """Move old soft-deleted rows to the archive tables in small transactions.
+
+    Progress is committed to the `archive_runs` row together with each batch. A failure or
+    cancellation is recorded on the row and logged, only a cancellation propagates out of
+    the background task. The archive lock taken by `claim_run` is released at the end.
+    """
+    try:
+        async with async_session_maker(bind=conn) as db:
+            for batch, counter in ((archive_products_batch, ArchiveRun.products_archived),
+                                   (archive_categories_batch, ArchiveRun.categories_archived)):
+                while moved := await batch(db):
+                    await db.execute(
+                        update(ArchiveRun).where(ArchiveRun.id == run_id).values({counter: counter + moved}))
+                    await db.commit()
+                    await asyncio.sleep(BATCH_PAUSE)
+                await db.commit()
+            await db.execute(update(ArchiveRun).where(ArchiveRun.id == run_id).values(finished_at=func.now()))
+            await db.commit()
+    except asyncio.CancelledError:
+        logger.warning('Archive run %s was cancelled', run_id)
+        await _record_failure(run_id, 'Cancelled')
+        raise
+    except Exception as exc:
+        logger.exception('Archive run %s failed', run_id)
+        await _record_failure(run_id, str(exc))
+    finally:
+        await _release(conn)
+
+
+async def _record_failure(run_id: int, error: str) -> None:
+    # a new session, the failed one may be sitting on a broken connection
+    try:
+        async with async_session_maker() as db:
+            await db.execute(update(ArchiveRun).where(ArchiveRun.id == run_id)
+                             .values(finished_at=func.now(), error=error))
+            await db.commit()
+    except Exception:
+        logger.exception('Could not record the failure of archive run %s', run_id)
+
+
+async def _release(conn: AsyncConnection) -> None:
+    # session level advisory locks survive the return to the pool, unlock before that
+    try:
+        await conn.rollback()
+        await conn.execute(select(func.pg_advisory_unlock(ARCHIVE_LOCK)))
+        await conn.commit()
+    except Exception:
+        logger.exception('Could not release the archive lock, dropping the connection')
+        # closing the server session releases the lock as well
+        await conn.invalidate()
+    finally:
+        await conn.close()
+
+
+async def _restore(db: AsyncSession, model, archive_model, columns: list[str], row_id: int) -> bool:
+    moved = await db.execute(insert(model).from_select(
+        columns, select(*[archive_model.__table__.c[column] for column in columns]).where(archive_model.id == row_id)))
+    if not moved.rowcount:
+        return False
+    # restart the retention clock, otherwise the next run archives the row again
+    await db.execute(update(model).where(model.id == row_id).values(updated_at=func.now()))
+    await db.execute(delete(archive_model).where(archive_model.id == row_id))
+    return True
+
+
+async def restore_product(db: AsyncSession, product_id: int) -> bool:
+    return await _restore(db, Product, ProductArchive, PRODUCT_COLUMNS, product_id)
+
+
+async def restore_category(db: AsyncSession, category_id: int) -> bool:
+    return await _restore(db, Category, CategoryArchive, CATEGORY_COLUMNS, category_id)
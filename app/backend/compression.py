@@ -0,0 +1,96 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# bodies below this size go out as is, the headers would eat the savings
+MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+# supported content-codings in order of preference
+ENCODINGS = ('br', 'gzip')
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """Pick the supported encoding with the highest q-value, brotli wins ties when it is installed.
+
+    `*` stands for any coding the header doesn't name. None means send the body as is, either
+    nothing we support is acceptable or the client ranks identity above all of them.
+    """
+    qualities = {}
+    for part in accept_encoding.lower().split(','):
+        coding, _, params = part.partition(';')
+        params = params.replace(' ', '')
+        try:
+            quality = float(params[2:]) if params.startswith('q=') else 1.0
+        except ValueError:
+            quality = 0.0
+        if coding := coding.strip():
+            qualities[coding] = quality
+    codings = [coding for coding in ENCODINGS if coding != 'br' or brotli is not None]
+    ranked = {coding: qualities.get(coding, qualities.get('*', 0.0)) for coding in codings}
+    # max keeps the first of equal candidates, that is the order of ENCODINGS
+    best = max(codings, key=ranked.__getitem__)
+    if ranked[best] <= 0 or ranked[best] < qualities.get('identity', 0.0):
+        return None
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """Compresses single-message JSON and text responses above MIN_SIZE.
+
+    Responses that already carry Content-Encoding (the precompressed catalog payloads)
+    and streaming responses pass through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        headers = dict(scope['headers'])
+        encoding = negotiate(headers.get(b'accept-encoding', b'').decode('latin-1'))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start_message = None
+
+        async def send_compressed(message):
+            nonlocal start_message
+            if message['type'] == 'http.response.start':
+                start_message = message
+                return
+            if start_message is None:
+                return await send(message)
+
+            start, start_message = start_message, None
+            response_headers = dict(start['headers'])
+            content_type = response_headers.get(b'content-type', b'').decode('latin-1')
+            body = message.get('body', b'')
+            if (message.get('more_body') or b'content-encoding' in response_headers or len(body) < MIN_SIZE
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)):
+                await send(start)
+                return await send(message)
+
+            body = compress(body, encoding)
+            vary = response_headers.get(b'vary')
+            headers = [(key, value) for key, value in start['headers'] if key not in (b'content-length', b'vary')]
+            headers += [
+                (b'content-encoding', encoding.encode()),
+                (b'content-length', str(len(body)).encode()),
+                (b'vary', vary + b', Accept-Encoding' if vary else b'Accept-Encoding'),
+            ]
+            await send({**start, 'headers': headers})
+            await send({**message, 'body': body})
+
+        await self.app(scope, receive, send_compressed)
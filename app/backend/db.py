@@ -1,5 +1,6 @@
 
 
+from sqlalchemy import select, func, table, column
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
@@ -7,10 +8,34 @@ from sqlalchemy.orm import DeclarativeBase
 
 
 
-engine = create_async_engine('postgresql+asyncpg://postgres_user:postgres_password@db:5432/postgres_database', echo=False)
+engine = create_async_engine('postgresql+asyncpg://postgres_user:postgres_password@db:5432/postgres_database', echo=False,
+                             pool_timeout=2)
 
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
 
 class Base(DeclarativeBase):
     pass
+
+
+pg_stat_activity = table('pg_stat_activity', column('pid'), column('datname'), column('backend_type'),
+                         column('xact_start'))
+
+
+def visibility_horizon():
+    """Timestamp below which every now()-stamped row is either committed or never will be.
+
+    updated_at is stamped with the start of the writing transaction but shows up only at its
+    commit, however long that takes, so a reader may only pass a stamp once no transaction
+    that started earlier is still open. Run it as a statement of its own before reading the
+    rows: under read committed that read takes a later snapshot and sees every transaction
+    that was no longer open here. Open transactions of other roles only count if the app
+    role can see their xact_start (same role or pg_read_all_stats).
+    """
+    oldest_open = (select(func.min(pg_stat_activity.c.xact_start))
+                   .where(pg_stat_activity.c.datname == func.current_database(),
+                          pg_stat_activity.c.backend_type == 'client backend',
+                          pg_stat_activity.c.pid != func.pg_backend_pid())
+                   .scalar_subquery())
+    # least() skips the NULL of an idle database
+    return select(func.least(func.now(), oldest_open))
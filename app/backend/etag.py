@@ -0,0 +1,92 @@
+import time
+
+from fastapi import Request, Response, status
+from sqlalchemy import select, update, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.backend.compression import ENCODINGS
+from app.backend.invalidation import bus, InvalidationEvent
+from app.models.versions import TableVersion
+
+# Cache-Control value sent with each conditional catalog route
+CACHE_CONTROL = {
+    'all_categories': 'public, max-age=60',
+    'all_products': 'public, max-age=30',
+    'product_detail': 'public, max-age=30',
+}
+
+# versions are pushed by the invalidation bus, the ttl only bounds staleness if an event is lost
+VERSION_TTL = 5.0
+
+_versions: dict[str, tuple[int, float]] = {}
+
+
+@bus.subscribe
+async def _on_invalidation(event: InvalidationEvent) -> None:
+    if event.table == '*':
+        _versions.clear()
+        return
+    cached = _versions.get(event.table)
+    if cached is None or cached[0] < event.version:
+        _versions[event.table] = (event.version, time.monotonic())
+
+
+async def get_table_version(db: AsyncSession, table_name: str) -> int:
+    cached = _versions.get(table_name)
+    if cached is not None and time.monotonic() - cached[1] < VERSION_TTL:
+        return cached[0]
+    version = await db.scalar(select(TableVersion.version).where(TableVersion.table_name == table_name)) or 0
+    # an event may have pushed a newer version while the read was in flight, never go back
+    cached = _versions.get(table_name)
+    if cached is not None and cached[0] > version:
+        version = cached[0]
+    _versions[table_name] = (version, time.monotonic())
+    return version
+
+
+async def bump_table_version(db: AsyncSession, table_name: str) -> int:
+    """Increment the change counter of a table inside the caller's transaction."""
+    version = await db.scalar(
+        update(TableVersion).where(TableVersion.table_name == table_name)
+        .values(version=TableVersion.version + 1)
+        .returning(TableVersion.version))
+    if version is None:
+        await db.execute(insert(TableVersion).values(table_name=table_name, version=1))
+        version = 1
+    return version
+
+
+def make_etag(*parts) -> str:
+    return '"' + '-'.join(str(part) for part in parts) + '"'
+
+
+def encoded_etag(etag: str, encoding: str | None) -> str:
+    """ETag of one content-coding of a representation, each coding gets its own validator."""
+    return etag[:-1] + '-' + encoding + '"' if encoding else etag
+
+
+def is_not_modified(request: Request, etag: str, exists: bool = True) -> str | None:
+    """Return the tag to answer 304 with if If-None-Match holds `etag` in any content-coding.
+
+    `*` only matches a resource that exists, pass `exists=False` while that is still unknown.
+    """
+    if_none_match = request.headers.get('if-none-match')
+    if not if_none_match:
+        return None
+    tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    if '*' in tags:
+        return etag if exists else None
+    variants = {encoded_etag(etag, encoding) for encoding in (None, *ENCODINGS)}
+    return next((tag for tag in tags if tag in variants), None)
+
+
+def set_cache_headers(response: Response, route: str, etag: str) -> None:
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = CACHE_CONTROL[route]
+    response.headers['Vary'] = 'Accept-Encoding'
+
+
+def not_modified_response(route: str, etag: str) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, route, etag)
+    return response
@@ -0,0 +1,290 @@
+import asyncio
+import os
+import uuid
+from abc import ABC, abstractmethod
+import json
+import logging
+from dataclasses import dataclass, asdict
+from typing import Awaitable, Callable
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.backend.db import engine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class InvalidationEvent:
+    """A committed change of `table`. `version` is the table_versions counter after the write,
+    `key` is the id of the changed row, or None when the whole table should be dropped.
+    Table '*' means the subscriber may have missed events and must flush everything."""
+    table: str
+    version: int
+    key: int | None = None
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, payload: str) -> 'InvalidationEvent':
+        return cls(**json.loads(payload))
+
+
+FLUSH_ALL = InvalidationEvent('*', 0)
+
+Handler = Callable[[InvalidationEvent], Awaitable[None]]
+
+
+class InvalidationBus(ABC):
+    """Fans out invalidation events to every worker's in-memory caches."""
+
+    def __init__(self):
+        self._handlers: list[Handler] = []
+
+    def subscribe(self, handler: Handler) -> Handler:
+        self._handlers.append(handler)
+        return handler
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    @abstractmethod
+    async def publish(self, event: InvalidationEvent) -> None:
+        """Deliver `event` to the local handlers and to every other worker."""
+
+    async def commit(self, db: AsyncSession, event: InvalidationEvent) -> None:
+        """Commit the write transaction in `db` and publish `event` about it."""
+        await db.commit()
+        await self.publish(event)
+
+    async def _dispatch(self, event: InvalidationEvent) -> None:
+        for handler in self._handlers:
+            try:
+                await handler(event)
+            except Exception:
+                logger.exception('Invalidation handler %r failed for %r', handler, event)
+
+
+class LocalInvalidationBus(InvalidationBus):
+    """In-process bus, for a single worker and for tests."""
+
+    async def publish(self, event: InvalidationEvent) -> None:
+        await self._dispatch(event)
+
+
+class ReconnectingInvalidationBus(InvalidationBus):
+    """A bus over a connection that may not be up yet or may drop.
+
+    `start` never fails: if the first connect does not succeed, it keeps retrying in
+    the background, and every successful reconnect is followed by a flush of all caches.
+    """
+
+    def __init__(self, reconnect_delay: float = 1.0):
+        super().__init__()
+        self.reconnect_delay = reconnect_delay
+        self._tasks: set[asyncio.Task] = set()
+        self._stopped = False
+        self._connected = False
+        # an event was published while disconnected, peers have to be told to flush
+        self._dropped = False
+
+    @abstractmethod
+    async def _connect(self) -> None:
+        pass
+
+    @abstractmethod
+    async def _disconnect(self) -> None:
+        pass
+
+    @abstractmethod
+    async def _send(self, event: InvalidationEvent) -> None:
+        pass
+
+    async def start(self) -> None:
+        self._stopped = False
+        try:
+            await self._connect()
+        except Exception:
+            logger.exception('Invalidation bus is not reachable, retrying in the background')
+            self._spawn(self._reconnect())
+        else:
+            self._connected = True
+
+    async def stop(self) -> None:
+        self._stopped = True
+        self._connected = False
+        for task in list(self._tasks):
+            task.cancel()
+        await self._disconnect()
+
+    async def publish(self, event: InvalidationEvent) -> None:
+        # deliver locally right away, other workers get it over the connection and
+        # implementations drop the echo of our own events
+        await self._dispatch(event)
+        if not self._connected:
+            self._dropped = True
+            return
+        try:
+            await self._send(event)
+        except Exception:
+            self._dropped = True
+            logger.exception('Could not publish %r', event)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _connection_lost(self) -> None:
+        if self._connected and not self._stopped:
+            self._connected = False
+            self._spawn(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        while not self._stopped:
+            try:
+                await self._disconnect()
+                await self._connect()
+            except Exception:
+                logger.exception('Invalidation bus reconnect failed')
+                await asyncio.sleep(self.reconnect_delay)
+            else:
+                self._connected = True
+                # events sent while we were away are lost, make subscribers start over
+                await self._dispatch(FLUSH_ALL)
+                if self._dropped:
+                    # and so are the ones we published, the other workers must start over too
+                    self._dropped = False
+                    try:
+                        await self._send(FLUSH_ALL)
+                    except Exception:
+                        self._dropped = True
+                        logger.exception('Could not publish %r', FLUSH_ALL)
+                return
+
+
+class PostgresInvalidationBus(ReconnectingInvalidationBus):
+    """Bus over Postgres LISTEN/NOTIFY, so every gunicorn worker sees every write.
+
+    `commit` sends the NOTIFY from the write transaction itself, Postgres delivers it to
+    the other workers exactly when the write commits and drops it if the write rolls back.
+    Payloads carry the id of the sending worker, so a worker skips its own events.
+    """
+
+    channel = 'cache_invalidation'
+
+    def __init__(self, dsn: str, reconnect_delay: float = 1.0):
+        super().__init__(reconnect_delay)
+        self.dsn = dsn
+        self.origin = uuid.uuid4().hex
+        self._conn = None
+        self._publish_lock = asyncio.Lock()
+
+    async def commit(self, db: AsyncSession, event: InvalidationEvent) -> None:
+        await db.execute(select(func.pg_notify(self.channel, self._payload(event))))
+        await db.commit()
+        await self._dispatch(event)
+
+    async def _connect(self) -> None:
+        import asyncpg
+
+        self._conn = await asyncpg.connect(self.dsn)
+        await self._conn.add_listener(self.channel, self._on_notify)
+        self._conn.add_termination_listener(self._on_terminate)
+
+    async def _disconnect(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None and not conn.is_closed():
+            await conn.close()
+
+    async def _send(self, event: InvalidationEvent) -> None:
+        async with self._publish_lock:
+            await self._conn.execute('SELECT pg_notify($1, $2)', self.channel, self._payload(event))
+
+    def _payload(self, event: InvalidationEvent) -> str:
+        return f'{self.origin}:{event.to_json()}'
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        origin, _, event = payload.partition(':')
+        if origin == self.origin:
+            # our own publish, already dispatched locally
+            return
+        self._spawn(self._dispatch(InvalidationEvent.from_json(event)))
+
+    def _on_terminate(self, connection) -> None:
+        self._connection_lost()
+
+
+class UnixSocketInvalidationHub:
+    """Relays newline-delimited events between UnixSocketInvalidationBus clients.
+
+    Every line a client sends is forwarded to all other clients.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._server = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    async def start(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._serve, path=self.path)
+
+    async def stop(self) -> None:
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        try:
+            while line := await reader.readline():
+                for other in list(self._writers):
+                    if other is not writer:
+                        other.write(line)
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+
+class UnixSocketInvalidationBus(ReconnectingInvalidationBus):
+    """Bus through a UnixSocketInvalidationHub, for tests and single-host setups without Postgres."""
+
+    def __init__(self, path: str, reconnect_delay: float = 0.1):
+        super().__init__(reconnect_delay)
+        self.path = path
+        self._writer = None
+        self._reader_task = None
+
+    async def _connect(self) -> None:
+        reader, self._writer = await asyncio.open_unix_connection(self.path)
+        self._reader_task = asyncio.get_running_loop().create_task(self._read(reader))
+
+    async def _disconnect(self) -> None:
+        if self._reader_task is not None and self._reader_task is not asyncio.current_task():
+            self._reader_task.cancel()
+        self._reader_task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def _send(self, event: InvalidationEvent) -> None:
+        self._writer.write(event.to_json().encode() + b'\n')
+        await self._writer.drain()
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while line := await reader.readline():
+                await self._dispatch(InvalidationEvent.from_json(line.decode()))
+        finally:
+            self._connection_lost()
+
+
+bus = PostgresInvalidationBus(engine.url.set(drivername='postgresql').render_as_string(hide_password=False))
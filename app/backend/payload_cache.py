@@ -0,0 +1,64 @@
+import json
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.backend.compression import negotiate, compress, MIN_SIZE
+from app.backend.etag import set_cache_headers, encoded_etag
+
+
+class CachedPayload:
+    """A serialized response body plus its compressed variants, made on first demand."""
+
+    def __init__(self, etag: str, body: bytes):
+        self.etag = etag
+        self._bodies = {None: body}
+
+    def body(self, encoding: str | None) -> bytes:
+        if encoding not in self._bodies:
+            self._bodies[encoding] = compress(self._bodies[None], encoding)
+        return self._bodies[encoding]
+
+
+class PayloadCache:
+    """Per-worker LRU of catalog payloads keyed by route and parameters.
+
+    An entry is only served while its ETag matches the current table version,
+    so a write makes it unreachable without explicit invalidation.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, CachedPayload] = OrderedDict()
+
+    def get(self, key: Hashable, etag: str) -> CachedPayload | None:
+        payload = self._entries.get(key)
+        if payload is None or payload.etag != etag:
+            return None
+        self._entries.move_to_end(key)
+        return payload
+
+    def put(self, key: Hashable, etag: str, content: Any) -> CachedPayload:
+        body = json.dumps(jsonable_encoder(content), ensure_ascii=False, allow_nan=False,
+                          separators=(',', ':')).encode('utf-8')
+        payload = self._entries[key] = CachedPayload(etag, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return payload
+
+
+def payload_response(request: Request, route: str, payload: CachedPayload) -> Response:
+    encoding = None
+    if len(payload.body(None)) >= MIN_SIZE:
+        encoding = negotiate(request.headers.get('accept-encoding', ''))
+    response = Response(content=payload.body(encoding), media_type='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    set_cache_headers(response, route, encoded_etag(payload.etag, encoding))
+    return response
+
+
+catalog_payloads = PayloadCache()
@@ -0,0 +1,77 @@
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+class PrefixIndex:
+    """Case-insensitive prefix search over product and category names.
+
+    Entries are kept in parallel columns sorted by lowercased name, so a prefix lookup is
+    two bisects and the matches form one contiguous range. Ids and ratings live in typed
+    arrays; categories are stored with negative ids to share the id column with products.
+    `_ref_keys` holds the ids in id order with their names alongside in `_ref_names`, so a
+    removal finds the name by bisecting, then bisects to the entry instead of scanning. Two
+    flat columns cost a fraction of a dict with a boxed int per entry.
+    """
+
+    def __init__(self):
+        self._names: list[str] = []
+        self._slugs: list[str] = []
+        self._refs = array('q')
+        self._ratings = array('f')
+        self._ref_keys = array('q')
+        self._ref_names: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def build(self, items) -> None:
+        """Replace the whole index with `(ref, name, slug, rating)` items."""
+        items = sorted(items, key=lambda item: item[1].lower())
+        self._names = [item[1] for item in items]
+        self._slugs = [item[2] for item in items]
+        self._refs = array('q', (item[0] for item in items))
+        self._ratings = array('f', (item[3] or 0.0 for item in items))
+        order = sorted(range(len(self._refs)), key=self._refs.__getitem__)
+        self._ref_keys = array('q', (self._refs[position] for position in order))
+        self._ref_names = [self._names[position] for position in order]
+
+    def add(self, ref: int, name: str, slug: str, rating: float | None) -> None:
+        self.remove(ref)
+        position = bisect_right(self._names, name.lower(), key=str.lower)
+        self._names.insert(position, name)
+        self._slugs.insert(position, slug)
+        self._refs.insert(position, ref)
+        self._ratings.insert(position, rating or 0.0)
+        key = bisect_left(self._ref_keys, ref)
+        self._ref_keys.insert(key, ref)
+        self._ref_names.insert(key, name)
+
+    def remove(self, ref: int) -> None:
+        key = bisect_left(self._ref_keys, ref)
+        if key == len(self._ref_keys) or self._ref_keys[key] != ref:
+            return
+        name = self._ref_names[key]
+        del self._ref_keys[key]
+        del self._ref_names[key]
+        # entries with the same lowercased name are adjacent, walk them to find ours
+        position = bisect_left(self._names, name.lower(), key=str.lower)
+        while self._refs[position] != ref:
+            position += 1
+        del self._names[position]
+        del self._slugs[position]
+        del self._refs[position]
+        del self._ratings[position]
+
+    def search(self, prefix: str, limit: int = 10) -> list[dict]:
+        prefix = prefix.lower()
+        start = bisect_left(self._names, prefix, key=str.lower)
+        end = bisect_left(self._names, prefix + '\U0010ffff', lo=start, key=str.lower)
+        best = heapq.nlargest(limit, range(start, end), key=self._ratings.__getitem__)
+        return [{
+            'kind': 'product' if self._refs[position] > 0 else 'category',
+            'id': abs(self._refs[position]),
+            'name': self._names[position],
+            'slug': self._slugs[position],
+            'rating': self._ratings[position],
+        } for position in best]
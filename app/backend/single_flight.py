@@ -0,0 +1,57 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+from fastapi import HTTPException, status
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls inside one worker.
+
+    The first caller for a key runs the coroutine, callers that arrive while it
+    is still in flight await the same result (or exception) instead of issuing
+    their own query. If the leading caller is cancelled, a waiting caller takes
+    over the call instead of being cancelled with it.
+    """
+
+    def __init__(self, timeout: float = 5.0):
+        self.timeout = timeout
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            while (future := self._calls.get(key)) is not None:
+                try:
+                    return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+                except asyncio.CancelledError:
+                    if not future.cancelled() or asyncio.current_task().cancelling():
+                        raise
+                    # the leader went away, loop around and lead the call ourselves
+            return await self._lead(key, fn)
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail='Catalog query timed out'
+            )
+
+    async def _lead(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await asyncio.wait_for(fn(), self.timeout)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # the leader re-raises on its own, don't warn if nobody else waited
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+
+catalog_flight = SingleFlight(timeout=5.0)
@@ -1,7 +1,42 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from app.routers import category, products, auth, permission
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from app.backend.admission import AdmissionMiddleware, pool_timeout_handler, db_error_handler
+from app.backend.analytics import refresh_loop
+from app.backend.compression import CompressionMiddleware
+from app.backend.invalidation import bus
+from app.routers import category, products, auth, permission, search, analytics, archive
+from app.routers.archive import archive_tasks
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await bus.start()
+    try:
+        await search.load_autocomplete_index()
+    except Exception:
+        # the database may still be booting, the bus rebuilds the index once it reconnects
+        logger.exception('Could not load the autocomplete index')
+    analytics_refresh = asyncio.create_task(refresh_loop())
+    yield
+    analytics_refresh.cancel()
+    # a cancelled archive run records itself as finished, let it do that before exiting
+    for task in archive_tasks:
+        task.cancel()
+    await asyncio.gather(*archive_tasks, return_exceptions=True)
+    await bus.stop()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(AdmissionMiddleware)
+app.add_exception_handler(PoolTimeoutError, pool_timeout_handler)
+app.add_exception_handler(DBAPIError, db_error_handler)
 
 
 @app.get("/")
@@ -13,3 +48,6 @@ app.include_router(category.router)
 app.include_router(products.router)
 app.include_router(auth.router)
 app.include_router(permission.router)
+app.include_router(search.router)
+app.include_router(analytics.router)
+app.include_router(archive.router)
@@ -22,7 +22,7 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 
 from app.backend.db import Base
-from app.models import category, products, user
+from app.models import category, products, user, versions, analytics, archive
 target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
@@ -0,0 +1,35 @@
+"""add table versions
+
+Revision ID: 3a1f5c2e9b7d
+Revises: c4b177161eb8
+Create Date: 2026-10-19 10:02:11.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a1f5c2e9b7d'
+down_revision: Union[str, None] = 'c4b177161eb8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    table_versions = op.create_table('table_versions',
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    op.bulk_insert(table_versions, [
+        {'table_name': 'categories', 'version': 0},
+        {'table_name': 'products', 'version': 0},
+        {'table_name': 'users', 'version': 0},
+    ])
+
+
+def downgrade() -> None:
+    op.drop_table('table_versions')
@@ -0,0 +1,34 @@
+"""add updated_at to products and categories
+
+Revision ID: 9b2d4e7f1c03
+Revises: 3a1f5c2e9b7d
+Create Date: 2026-10-19 11:24:40.502117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2d4e7f1c03'
+down_revision: Union[str, None] = '3a1f5c2e9b7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('categories', sa.Column('updated_at', sa.DateTime(timezone=True),
+                                          server_default=sa.text('now()'), nullable=True))
+    op.create_index(op.f('ix_categories_updated_at'), 'categories', ['updated_at'], unique=False)
+    op.add_column('products', sa.Column('updated_at', sa.DateTime(timezone=True),
+                                        server_default=sa.text('now()'), nullable=True))
+    op.create_index(op.f('ix_products_updated_at'), 'products', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_products_updated_at'), table_name='products')
+    op.drop_column('products', 'updated_at')
+    op.drop_index(op.f('ix_categories_updated_at'), table_name='categories')
+    op.drop_column('categories', 'updated_at')
@@ -0,0 +1,74 @@
+"""add archive tables
+
+Revision ID: b7e2f9c4a8d1
+Revises: e5c8a1d3f6b2
+Create Date: 2026-10-19 15:37:02.264981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2f9c4a8d1'
+down_revision: Union[str, None] = 'e5c8a1d3f6b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('products_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('slug', sa.String(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('price', sa.Integer(), nullable=True),
+    sa.Column('image_url', sa.String(), nullable=True),
+    sa.Column('stock', sa.Integer(), nullable=True),
+    sa.Column('supplier_id', sa.Integer(), nullable=True),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('rating', sa.Float(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.ForeignKeyConstraint(['supplier_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_products_archive_category_id'), 'products_archive', ['category_id'], unique=False)
+    op.create_index(op.f('ix_products_archive_slug'), 'products_archive', ['slug'], unique=False)
+    op.create_index(op.f('ix_products_archive_supplier_id'), 'products_archive', ['supplier_id'], unique=False)
+    op.create_table('categories_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('slug', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('parent_id', sa.Integer(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_categories_archive_slug'), 'categories_archive', ['slug'], unique=False)
+    op.create_table('archive_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('products_archived', sa.Integer(), nullable=False),
+    sa.Column('categories_archived', sa.Integer(), nullable=False),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_archive_runs_id'), 'archive_runs', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_archive_runs_id'), table_name='archive_runs')
+    op.drop_table('archive_runs')
+    op.drop_index(op.f('ix_categories_archive_slug'), table_name='categories_archive')
+    op.drop_table('categories_archive')
+    op.drop_index(op.f('ix_products_archive_supplier_id'), table_name='products_archive')
+    op.drop_index(op.f('ix_products_archive_slug'), table_name='products_archive')
+    op.drop_index(op.f('ix_products_archive_category_id'), table_name='products_archive')
+    op.drop_table('products_archive')
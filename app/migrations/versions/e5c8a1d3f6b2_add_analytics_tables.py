@@ -0,0 +1,46 @@
+"""add analytics tables
+
+Revision ID: e5c8a1d3f6b2
+Revises: 9b2d4e7f1c03
+Create Date: 2026-10-19 14:08:51.731560
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5c8a1d3f6b2'
+down_revision: Union[str, None] = '9b2d4e7f1c03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('supplier_category_stats',
+    sa.Column('supplier_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('product_count', sa.Integer(), nullable=False),
+    sa.Column('stock_total', sa.Integer(), nullable=False),
+    sa.Column('out_of_stock_count', sa.Integer(), nullable=False),
+    sa.Column('avg_rating', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.ForeignKeyConstraint(['supplier_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('supplier_id', 'category_id')
+    )
+    op.create_index(op.f('ix_supplier_category_stats_category_id'), 'supplier_category_stats', ['category_id'],
+                    unique=False)
+    op.create_table('analytics_refresh',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('watermark', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('analytics_refresh')
+    op.drop_index(op.f('ix_supplier_category_stats_category_id'), table_name='supplier_category_stats')
+    op.drop_table('supplier_category_stats')
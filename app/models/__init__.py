@@ -1,2 +1,5 @@
 from .category import Category
-from .products import Product
\ No newline at end of file
+from .products import Product
+from .versions import TableVersion
+from .analytics import SupplierCategoryStats, AnalyticsRefresh
+from .archive import ProductArchive, CategoryArchive, ArchiveRun
\ No newline at end of file
@@ -0,0 +1,21 @@
+from app.backend.db import Base
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+
+
+class SupplierCategoryStats(Base):
+    __tablename__ = 'supplier_category_stats'
+
+    supplier_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    category_id = Column(Integer, ForeignKey('categories.id'), primary_key=True, index=True)
+    product_count = Column(Integer, nullable=False, default=0)
+    stock_total = Column(Integer, nullable=False, default=0)
+    out_of_stock_count = Column(Integer, nullable=False, default=0)
+    avg_rating = Column(Float)
+
+
+class AnalyticsRefresh(Base):
+    __tablename__ = 'analytics_refresh'
+
+    id = Column(Integer, primary_key=True)
+    watermark = Column(DateTime(timezone=True))
+    refreshed_at = Column(DateTime(timezone=True))
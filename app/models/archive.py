@@ -0,0 +1,43 @@
+from app.backend.db import Base
+from sqlalchemy import Column, ForeignKey, Integer, String, Boolean, Float, DateTime, func
+
+
+class ProductArchive(Base):
+    __tablename__ = 'products_archive'
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String)
+    slug = Column(String, index=True)
+    description = Column(String)
+    price = Column(Integer)
+    image_url = Column(String)
+    stock = Column(Integer)
+    supplier_id = Column(Integer, ForeignKey('users.id'), index=True)
+    category_id = Column(Integer, ForeignKey('categories.id'), index=True)
+    rating = Column(Float)
+    is_active = Column(Boolean)
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class CategoryArchive(Base):
+    __tablename__ = 'categories_archive'
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String)
+    slug = Column(String, index=True)
+    is_active = Column(Boolean)
+    parent_id = Column(Integer)
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ArchiveRun(Base):
+    __tablename__ = 'archive_runs'
+
+    id = Column(Integer, primary_key=True, index=True)
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True))
+    products_archived = Column(Integer, nullable=False, default=0)
+    categories_archived = Column(Integer, nullable=False, default=0)
+    error = Column(String)
@@ -0,0 +1,9 @@
+from app.backend.db import Base
+from sqlalchemy import Column, Integer, String
+
+
+class TableVersion(Base):
+    __tablename__ = 'table_versions'
+
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
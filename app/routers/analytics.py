@@ -0,0 +1,96 @@
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, status, HTTPException
+from typing import Annotated
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.backend.analytics import refresh_supplier_stats
+from app.backend.db_depends import get_db
+from app.models import *
+from app.routers.auth import get_current_user
+
+router = APIRouter(prefix='/analytics', tags=['analytics'])
+
+
+async def freshness(db: AsyncSession) -> dict:
+    # the stats cover changes up to the watermark, later ones wait for the next refresh
+    state = await db.execute(select(AnalyticsRefresh.refreshed_at, AnalyticsRefresh.watermark)
+                             .where(AnalyticsRefresh.id == 1))
+    refreshed_at, watermark = state.first() or (None, None)
+    return {
+        'refreshed_at': refreshed_at,
+        'watermark': watermark,
+        'staleness_seconds': (datetime.now(timezone.utc) - watermark).total_seconds() if watermark else None
+    }
+
+
+@router.get('/supplier')
+async def supplier_analytics(db: Annotated[AsyncSession, Depends(get_db)],
+                             get_user: Annotated[dict, Depends(get_current_user)], supplier_id: int | None = None):
+    if supplier_id is None:
+        supplier_id = get_user.get('id')
+    if not (get_user.get('is_admin') or (get_user.get('is_supplier') and supplier_id == get_user.get('id'))):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='You are not authorized to use this method'
+        )
+    stats = await db.scalars(
+        select(SupplierCategoryStats).where(SupplierCategoryStats.supplier_id == supplier_id)
+        .order_by(SupplierCategoryStats.category_id))
+    stats = stats.all()
+    rated = sum(row.product_count for row in stats if row.avg_rating is not None)
+    rating_total = sum(row.avg_rating * row.product_count for row in stats if row.avg_rating is not None)
+    return {
+        'supplier_id': supplier_id,
+        'product_count': sum(row.product_count for row in stats),
+        'stock_total': sum(row.stock_total for row in stats),
+        'out_of_stock_count': sum(row.out_of_stock_count for row in stats),
+        'avg_rating': rating_total / rated if rated else None,
+        'categories': stats,
+        **await freshness(db)
+    }
+
+
+@router.get('/admin')
+async def admin_analytics(db: Annotated[AsyncSession, Depends(get_db)],
+                          get_user: Annotated[dict, Depends(get_current_user)]):
+    if get_user.get('is_admin'):
+        rows = await db.execute(
+            select(SupplierCategoryStats.category_id,
+                   func.count(SupplierCategoryStats.supplier_id).label('supplier_count'),
+                   func.sum(SupplierCategoryStats.product_count).label('product_count'),
+                   func.sum(SupplierCategoryStats.stock_total).label('stock_total'),
+                   func.sum(SupplierCategoryStats.out_of_stock_count).label('out_of_stock_count'),
+                   (func.sum(SupplierCategoryStats.avg_rating * SupplierCategoryStats.product_count) /
+                    func.nullif(func.sum(SupplierCategoryStats.product_count), 0)).label('avg_rating'))
+            .group_by(SupplierCategoryStats.category_id)
+            .order_by(SupplierCategoryStats.category_id))
+        return {
+            'categories': [row._asdict() for row in rows],
+            **await freshness(db)
+        }
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="You don't have admin permission"
+        )
+
+
+@router.post('/refresh')
+async def refresh_analytics(db: Annotated[AsyncSession, Depends(get_db)],
+                            get_user: Annotated[dict, Depends(get_current_user)]):
+    if get_user.get('is_admin'):
+        if not await refresh_supplier_stats(db):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail='Refresh is already running'
+            )
+        return {
+            'status_code': status.HTTP_200_OK,
+            'transaction': 'Analytics refresh is successful'
+        }
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="You don't have admin permission"
+        )
@@ -0,0 +1,105 @@
+import asyncio
+import contextvars
+from fastapi import APIRouter, Depends, status, HTTPException
+from typing import Annotated
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.backend.archive import claim_run, run_archive, restore_product, restore_category
+from app.backend.db_depends import get_db
+from app.models import *
+from app.routers.auth import get_current_user
+
+router = APIRouter(prefix='/archive', tags=['archive'])
+
+archive_tasks: set[asyncio.Task] = set()
+
+
+def require_admin(get_user: dict):
+    if not get_user.get('is_admin'):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="You don't have admin permission"
+        )
+
+
+@router.post('/run')
+async def start_archive(get_user: Annotated[dict, Depends(get_current_user)]):
+    require_admin(get_user)
+    claimed = await claim_run()
+    if claimed is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail='Archive run is already in progress'
+        )
+    run_id, conn = claimed
+    # a fresh context, so the job doesn't inherit this request's deadline and statement timeout
+    task = asyncio.create_task(run_archive(run_id, conn), context=contextvars.Context())
+    archive_tasks.add(task)
+    task.add_done_callback(archive_tasks.discard)
+    return {
+        'status_code': status.HTTP_202_ACCEPTED,
+        'run_id': run_id
+    }
+
+
+@router.get('/status')
+async def archive_status(db: Annotated[AsyncSession, Depends(get_db)],
+                         get_user: Annotated[dict, Depends(get_current_user)], run_id: int | None = None):
+    require_admin(get_user)
+    query = select(ArchiveRun)
+    query = query.where(ArchiveRun.id == run_id) if run_id else query.order_by(ArchiveRun.id.desc()).limit(1)
+    run = await db.scalar(query)
+    if run is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='There is no archive run found'
+        )
+    return run
+
+
+@router.post('/restore/product')
+async def restore_archived_product(db: Annotated[AsyncSession, Depends(get_db)], product_id: int,
+                                   get_user: Annotated[dict, Depends(get_current_user)]):
+    require_admin(get_user)
+    try:
+        restored = await restore_product(db, product_id)
+        await db.commit()
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail='Product slug is taken or its category is archived'
+        )
+    if not restored:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='There is no archived product found'
+        )
+    return {
+        'status_code': status.HTTP_200_OK,
+        'transaction': 'Product restore is successful'
+    }
+
+
+@router.post('/restore/category')
+async def restore_archived_category(db: Annotated[AsyncSession, Depends(get_db)], category_id: int,
+                                    get_user: Annotated[dict, Depends(get_current_user)]):
+    require_admin(get_user)
+    try:
+        restored = await restore_category(db, category_id)
+        await db.commit()
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail='Category slug is taken or its parent is archived'
+        )
+    if not restored:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='There is no archived category found'
+        )
+    return {
+        'status_code': status.HTTP_200_OK,
+        'transaction': 'Category restore is successful'
+    }
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, status, HTTPException, Request
 from typing import Annotated
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -8,25 +8,43 @@ from sqlalchemy import select, insert, update
 from app.routers.auth import get_current_user
 from app.schemas import CreateCategory
 from app.backend.db_depends import get_db
+from app.backend.single_flight import catalog_flight
+from app.backend.invalidation import bus, InvalidationEvent
+from app.backend.etag import (get_table_version, bump_table_version, make_etag, is_not_modified,
+                              not_modified_response)
+from app.backend.payload_cache import catalog_payloads, payload_response
 from slugify import slugify
 
 router = APIRouter(prefix='/category', tags=['category'])
 
 
 @router.get('/all_categories')
-async def get_all_categories(db: Annotated[AsyncSession, Depends(get_db)]):
-    categories = await db.scalars(select(Category).where(Category.is_active == True))
-    return categories.all()
+async def get_all_categories(db: Annotated[AsyncSession, Depends(get_db)], request: Request):
+    etag = make_etag('categories', await get_table_version(db, 'categories'))
+    if matched := is_not_modified(request, etag):
+        return not_modified_response('all_categories', matched)
+
+    key = ('all_categories',)
+    payload = catalog_payloads.get(key, etag)
+    if payload is None:
+        async def fetch():
+            categories = await db.scalars(select(Category).where(Category.is_active == True))
+            return catalog_payloads.put(key, etag, categories.all())
+
+        payload = await catalog_flight.do((*key, etag), fetch)
+    return payload_response(request, 'all_categories', payload)
 
 
 @router.post('/create')
 async def create_category(db: Annotated[AsyncSession, Depends(get_db)], create_category: CreateCategory,
                           get_user: Annotated[dict, Depends(get_current_user)]):
     if get_user.get('is_admin'):
-        await db.execute(insert(Category).values(name=create_category.name,
-                                                 parent_id=create_category.parent_id,
-                                                 slug=slugify(create_category.name)))
-        await db.commit()
+        category_id = await db.scalar(insert(Category).values(name=create_category.name,
+                                                              parent_id=create_category.parent_id,
+                                                              slug=slugify(create_category.name))
+                                      .returning(Category.id))
+        version = await bump_table_version(db, 'categories')
+        await bus.commit(db, InvalidationEvent('categories', version, category_id))
         return {
             'status_code': status.HTTP_201_CREATED,
             'transaction': 'Successful'
@@ -53,7 +71,8 @@ async def update_category(db: Annotated[AsyncSession, Depends(get_db)], category
             name=update_category.name,
             slug=slugify(update_category.name),
             parent_id=update_category.parent_id))
-        await db.commit()
+        version = await bump_table_version(db, 'categories')
+        await bus.commit(db, InvalidationEvent('categories', version, category_id))
         return {
             'status_code': status.HTTP_200_OK,
             'transaction': 'Category update is successful'
@@ -76,7 +95,8 @@ async def delete_category(db: Annotated[AsyncSession, Depends(get_db)], category
                 detail='There is no category found'
             )
         await db.execute(update(Category).where(Category.id == category_id).values(is_active=False))
-        await db.commit()
+        version = await bump_table_version(db, 'categories')
+        await bus.commit(db, InvalidationEvent('categories', version, category_id))
         return {
             'status_code': status.HTTP_200_OK,
             'transaction': 'Category delete is successful'
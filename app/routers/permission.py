@@ -6,6 +6,8 @@ from .auth import get_current_user
 from app.models.user import User
 from sqlalchemy.orm import Session
 from app.backend.db_depends import get_db
+from app.backend.etag import bump_table_version
+from app.backend.invalidation import bus, InvalidationEvent
 
 router = APIRouter(prefix='/permission', tags=['permission'])
 
@@ -23,14 +25,16 @@ async def supplier_permission(db: Annotated[Session, Depends(get_db)], get_user:
             )
         if user.is_supplier:
             await db.execute(update(User).where(User.id == user_id).values(is_supplier=False, is_customer=True))
-            await db.commit()
+            version = await bump_table_version(db, 'users')
+            await bus.commit(db, InvalidationEvent('users', version, user_id))
             return {
                 'status_code': status.HTTP_200_OK,
                 'detail': 'User is no longer supplier'
             }
         else:
             await db.execute(update(User).where(User.id == user_id).values(is_supplier=True, is_customer=False))
-            await db.commit()
+            version = await bump_table_version(db, 'users')
+            await bus.commit(db, InvalidationEvent('users', version, user_id))
             return {
                 'status_code': status.HTTP_200_OK,
                 'detail': 'User is now supplier'
@@ -55,14 +59,16 @@ async def delete_user(db: Annotated[Session, Depends(get_db)], get_user: Annotat
 
         if user.is_active:
             await db.execute(update(User).where(User.id == user_id).values(is_active=False))
-            await db.commit()
+            version = await bump_table_version(db, 'users')
+            await bus.commit(db, InvalidationEvent('users', version, user_id))
             return {
                 'status_code': status.HTTP_200_OK,
                 'detail': 'User is deleted'
             }
         else:
             await db.execute(update(User).where(User.id == user_id).values(is_active=True))
-            await db.commit()
+            version = await bump_table_version(db, 'users')
+            await bus.commit(db, InvalidationEvent('users', version, user_id))
             return {
                 'status_code': status.HTTP_200_OK,
                 'detail': 'User is activated'
@@ -1,44 +1,69 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, status, HTTPException, Request, Query
 from typing import Annotated
+from datetime import datetime, timedelta, timezone
 from slugify import slugify
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.backend.db import engine
+from app.backend.db import engine, visibility_horizon
 from app.backend.db_depends import get_db
-from sqlalchemy import select, insert, update
+from app.backend.single_flight import catalog_flight
+from app.backend.invalidation import bus, InvalidationEvent
+from app.backend.etag import (get_table_version, bump_table_version, make_etag, is_not_modified,
+                              not_modified_response)
+from app.backend.payload_cache import catalog_payloads, payload_response
+from sqlalchemy import select, insert, update, tuple_, or_
 
 from app.routers.auth import get_current_user
-from app.schemas import CreateProduct
+from app.schemas import CreateProduct, ProductBatch
 from app.models import *
 
 router = APIRouter(prefix='/products', tags=['products'])
 
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def encode_cursor(product: Product) -> str:
+    return f'{(product.updated_at - EPOCH) // timedelta(microseconds=1)}_{product.id}'
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    microseconds, product_id = cursor.split('_')
+    return EPOCH + timedelta(microseconds=int(microseconds)), int(product_id)
+
 
 @router.get('/')
-async def all_products(db: Annotated[AsyncSession, Depends(get_db)]):
-    products = await db.scalars(select(Product).where(Product.is_active == True, Product.stock > 0))
-    if not products:
-        return HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='There are no product'
-        )
-    return products.all()
+async def all_products(db: Annotated[AsyncSession, Depends(get_db)], request: Request):
+    etag = make_etag('products', await get_table_version(db, 'products'))
+    if matched := is_not_modified(request, etag):
+        return not_modified_response('all_products', matched)
+
+    key = ('all_products',)
+    payload = catalog_payloads.get(key, etag)
+    if payload is None:
+        async def fetch():
+            products = await db.scalars(select(Product).where(Product.is_active == True, Product.stock > 0))
+            return catalog_payloads.put(key, etag, products.all())
+
+        payload = await catalog_flight.do((*key, etag), fetch)
+    return payload_response(request, 'all_products', payload)
 
 
 @router.post('/create')
 async def create_product(db: Annotated[AsyncSession, Depends(get_db)], create_product: CreateProduct,
                          get_user: Annotated[dict, Depends(get_current_user)]):
     if get_user.get('is_supplier') or get_user.get('is_admin'):
-        await db.execute(insert(Product).values(name=create_product.name,
-                                                description=create_product.description,
-                                                price=create_product.price,
-                                                image_url=create_product.image_url,
-                                                stock=create_product.stock,
-                                                category_id=create_product.category,
-                                                rating=0.0,
-                                                slug=slugify(create_product.name),
-                                                supplier_id=get_user.get('id')))
-        await db.commit()
+        product_id = await db.scalar(insert(Product).values(name=create_product.name,
+                                                            description=create_product.description,
+                                                            price=create_product.price,
+                                                            image_url=create_product.image_url,
+                                                            stock=create_product.stock,
+                                                            category_id=create_product.category,
+                                                            rating=0.0,
+                                                            slug=slugify(create_product.name),
+                                                            supplier_id=get_user.get('id'))
+                                     .returning(Product.id))
+        version = await bump_table_version(db, 'products')
+        await bus.commit(db, InvalidationEvent('products', version, product_id))
         return {
             'status_code': status.HTTP_201_CREATED,
             'transaction': 'Successful'
@@ -50,33 +75,94 @@ async def create_product(db: Annotated[AsyncSession, Depends(get_db)], create_pr
         )
 
 
+@router.get('/changes')
+async def product_changes(db: Annotated[AsyncSession, Depends(get_db)], since: str | None = None,
+                          limit: Annotated[int, Query(ge=1, le=1000)] = 500):
+    # rows of still open transactions are held back, so one that started earlier but commits
+    # later can't slip behind a cursor that was already handed out
+    query = select(Product).where(Product.updated_at < await db.scalar(visibility_horizon()))
+    if since:
+        try:
+            cursor = decode_cursor(since)
+        except (ValueError, OverflowError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Invalid cursor'
+            )
+        query = query.where(tuple_(Product.updated_at, Product.id) > cursor)
+    products = await db.scalars(query.order_by(Product.updated_at, Product.id).limit(limit))
+    changes = products.all()
+    next_cursor = encode_cursor(changes[-1]) if changes else since
+    return {
+        'changes': changes,
+        'next_cursor': next_cursor
+    }
+
+
+@router.post('/batch')
+async def product_batch(db: Annotated[AsyncSession, Depends(get_db)], batch: ProductBatch):
+    products = await db.scalars(
+        select(Product).where(or_(Product.slug.in_(batch.slugs), Product.id.in_(batch.ids)),
+                              Product.is_active == True, Product.stock > 0))
+    products = products.all()
+    by_slug = {product.slug: product for product in products}
+    by_id = {product.id: product for product in products}
+    # slug and id lookups are answered in separate lists, each in the order it was requested,
+    # a repeated slug or id is answered once
+    slugs, ids = list(dict.fromkeys(batch.slugs)), list(dict.fromkeys(batch.ids))
+    return {
+        'slugs': [by_slug[slug] for slug in slugs if slug in by_slug],
+        'ids': [by_id[product_id] for product_id in ids if product_id in by_id],
+        'missing': {
+            'slugs': [slug for slug in slugs if slug not in by_slug],
+            'ids': [product_id for product_id in ids if product_id not in by_id]
+        }
+    }
+
+
 @router.get('/{category_slug}')
 async def product_by_category(db: Annotated[AsyncSession, Depends(get_db)], category_slug: str):
-    category = await db.scalar(select(Category).where(Category.slug == category_slug))
-    if not category:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Category not found'
-        )
-    subcategories = await db.scalars(select(Category).where(Category.parent_id == category.id))
+    async def fetch():
+        category = await db.scalar(select(Category).where(Category.slug == category_slug))
+        if not category:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail='Category not found'
+            )
+        subcategories = await db.scalars(select(Category).where(Category.parent_id == category.id))
+
+        categories_and_subcategories = [category.id] + [i.id for i in subcategories.all()]
+        products_category = await db.scalars(
+            select(Product).where(Product.category_id.in_(categories_and_subcategories), Product.is_active == True,
+                                  Product.stock > 0))
+        return products_category.all()
 
-    categories_and_subcategories = [category.id] + [i.id for i in subcategories.all()]
-    products_category = await db.scalars(
-        select(Product).where(Product.category_id.in_(categories_and_subcategories), Product.is_active == True,
-                              Product.stock > 0))
-    return products_category.all()
+    return await catalog_flight.do(('product_by_category', category_slug), fetch)
 
 
 @router.get('/detail/{product_slug}')
-async def product_detail(db: Annotated[AsyncSession, Depends(get_db)], product_slug: str):
-    product = await db.scalar(
-        select(Product).where(Product.slug == product_slug, Product.is_active == True, Product.stock > 0))
-    if not product:
+async def product_detail(db: Annotated[AsyncSession, Depends(get_db)], product_slug: str, request: Request):
+    etag = make_etag('products', await get_table_version(db, 'products'))
+    if matched := is_not_modified(request, etag, exists=False):
+        return not_modified_response('product_detail', matched)
+
+    key = ('product_detail', product_slug)
+    payload = catalog_payloads.get(key, etag)
+    if payload is None:
+        async def fetch():
+            product = await db.scalar(
+                select(Product).where(Product.slug == product_slug, Product.is_active == True, Product.stock > 0))
+            return catalog_payloads.put(key, etag, product) if product else None
+
+        payload = await catalog_flight.do((*key, etag), fetch)
+    if not payload:
         return HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail='There are no product'
         )
-    return product
+    if matched := is_not_modified(request, etag):
+        return not_modified_response('product_detail', matched)
+    return payload_response(request, 'product_detail', payload)
 
 
 @router.put('/detail/{product_slug}')
@@ -99,7 +185,8 @@ async def update_product(db: Annotated[AsyncSession, Depends(get_db)], product_s
                         stock=update_product_model.stock,
                         category_id=update_product_model.category,
                         slug=slugify(update_product_model.name)))
-            await db.commit()
+            version = await bump_table_version(db, 'products')
+            await bus.commit(db, InvalidationEvent('products', version, product_update.id))
             return {
                 'status_code': status.HTTP_200_OK,
                 'transaction': 'Product update is successful'
@@ -128,7 +215,8 @@ async def delete_product(db: Annotated[AsyncSession, Depends(get_db)], product_i
     if get_user.get('is_supplier') or get_user.get('is_admin'):
         if get_user.get('id') == product_delete.supplier_id or get_user.get('is_admin'):
             await db.execute(update(Product).where(Product.id == product_id).values(is_active=False))
-            await db.commit()
+            version = await bump_table_version(db, 'products')
+            await bus.commit(db, InvalidationEvent('products', version, product_id))
             return {
                 'status_code': status.HTTP_200_OK,
                 'transaction': 'Product delete is successful'
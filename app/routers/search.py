@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Query
+from typing import Annotated
+from sqlalchemy import select
+
+from app.backend.db import async_session_maker
+from app.backend.invalidation import bus, InvalidationEvent
+from app.backend.prefix_index import PrefixIndex
+from app.models import *
+
+router = APIRouter(prefix='/search', tags=['search'])
+
+autocomplete_index = PrefixIndex()
+
+
+async def load_autocomplete_index():
+    async with async_session_maker() as db:
+        products = await db.execute(
+            select(Product.id, Product.name, Product.slug, Product.rating)
+            .where(Product.is_active == True, Product.stock > 0))
+        categories = await db.execute(
+            select(Category.id, Category.name, Category.slug).where(Category.is_active == True))
+        autocomplete_index.build(
+            [(product.id, product.name, product.slug, product.rating) for product in products] +
+            [(-category.id, category.name, category.slug, None) for category in categories])
+
+
+@bus.subscribe
+async def _on_invalidation(event: InvalidationEvent):
+    if event.table == '*':
+        await load_autocomplete_index()
+    elif event.table == 'products' and event.key is not None:
+        async with async_session_maker() as db:
+            product = await db.scalar(select(Product).where(Product.id == event.key))
+        if product and product.is_active and product.stock > 0:
+            autocomplete_index.add(product.id, product.name, product.slug, product.rating)
+        else:
+            autocomplete_index.remove(event.key)
+    elif event.table == 'categories' and event.key is not None:
+        async with async_session_maker() as db:
+            category = await db.scalar(select(Category).where(Category.id == event.key))
+        if category and category.is_active:
+            autocomplete_index.add(-category.id, category.name, category.slug, None)
+        else:
+            autocomplete_index.remove(-event.key)
+
+
+@router.get('/autocomplete')
+async def autocomplete(q: Annotated[str, Query(min_length=1, max_length=100)],
+                       limit: Annotated[int, Query(ge=1, le=50)] = 10):
+    return autocomplete_index.search(q, limit)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class CreateProduct(BaseModel):
@@ -10,6 +10,11 @@ class CreateProduct(BaseModel):
     category: int
 
 
+class ProductBatch(BaseModel):
+    slugs: list[str] = Field(default=[], max_length=100)
+    ids: list[int] = Field(default=[], max_length=100)
+
+
 class CreateCategory(BaseModel):
     name: str
     parent_id: int | None
@@ -0,0 +1,51 @@
+"""One /products/batch call versus N sequential /products/detail calls.
+
+Runs against a live app backed by Postgres (e.g. the docker compose stack):
+
+    python benchmarks/batch_lookup.py http://localhost:8000
+"""
+import sys
+import time
+
+import httpx
+
+SIZES = (1, 10, 50, 100)
+ROUNDS = 5
+
+
+def product_slugs(client: httpx.Client, count: int) -> list[str]:
+    slugs = [product['slug'] for product in client.get('/products/').json()]
+    if not slugs:
+        sys.exit('no active products to look up, seed the database first')
+    return (slugs * (count // len(slugs) + 1))[:count]
+
+
+def best_of(fn) -> float:
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(base_url: str) -> None:
+    with httpx.Client(base_url=base_url, timeout=30) as client:
+        print(f'{"slugs":>6} {"sequential ms":>14} {"batch ms":>9} {"speedup":>8}')
+        for size in SIZES:
+            slugs = product_slugs(client, size)
+
+            def sequential():
+                for slug in slugs:
+                    client.get(f'/products/detail/{slug}').raise_for_status()
+
+            def batch():
+                client.post('/products/batch', json={'slugs': slugs}).raise_for_status()
+
+            sequential_time, batch_time = best_of(sequential), best_of(batch)
+            print(f'{size:>6} {sequential_time * 1000:>14.1f} {batch_time * 1000:>9.1f} '
+                  f'{sequential_time / batch_time:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else 'http://localhost:8000')
@@ -0,0 +1,58 @@
+"""Bytes on the wire and CPU per request of a catalog payload in each content-coding.
+
+"fresh" compresses the body on every request, like CompressionMiddleware does for
+uncached responses. "cached" serves the variant kept by CachedPayload.
+
+    python benchmarks/compression.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.backend.compression import compress, brotli
+from app.backend.payload_cache import PayloadCache
+
+SIZES = (10, 100, 1000)
+REQUESTS = 200
+
+
+def products(count: int) -> list[dict]:
+    return [{
+        'id': number,
+        'name': f'Product {number}',
+        'slug': f'product-{number}',
+        'description': f'Description of product {number}, sold by supplier {number % 17}',
+        'price': 100 + number % 900,
+        'image_url': f'https://example.com/images/product-{number}.jpg',
+        'stock': number % 50,
+        'category_id': number % 12,
+        'rating': round(3 + (number % 20) / 10, 1),
+        'is_active': True,
+    } for number in range(1, count + 1)]
+
+
+def cpu_per_request(fn) -> float:
+    started = time.process_time()
+    for _ in range(REQUESTS):
+        fn()
+    return (time.process_time() - started) / REQUESTS
+
+
+def main() -> None:
+    encodings = [None, 'gzip'] + (['br'] if brotli is not None else [])
+    print(f'{"products":>8} {"coding":>8} {"bytes":>9} {"ratio":>6} {"fresh us":>9} {"cached us":>10}')
+    for size in SIZES:
+        payload = PayloadCache().put(('all_products',), '"products-1"', products(size))
+        plain = payload.body(None)
+        for encoding in encodings:
+            body = payload.body(encoding)
+            fresh = cpu_per_request(lambda: compress(plain, encoding)) if encoding else 0.0
+            cached = cpu_per_request(lambda: payload.body(encoding))
+            print(f'{size:>8} {encoding or "identity":>8} {len(body):>9} {len(plain) / len(body):>6.1f} '
+                  f'{fresh * 1e6:>9.1f} {cached * 1e6:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Memory footprint and latency of the autocomplete prefix index.
+
+    python benchmarks/prefix_index.py [names]
+"""
+import gc
+import os
+import random
+import string
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.backend.prefix_index import PrefixIndex
+
+NAMES = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+NAME_LENGTH = 20
+
+
+def make_items() -> list[tuple]:
+    random.seed(1)
+    return [(ref, ''.join(random.choices(string.ascii_lowercase + ' ', k=NAME_LENGTH)), f'slug-{ref}',
+             random.random() * 5) for ref in range(1, NAMES + 1)]
+
+
+def main():
+    gc.collect()
+    # the rows are made inside the traced window, so the name and slug strings the index
+    # keeps are counted, the source list is dropped before reading the counter
+    tracemalloc.start()
+    items = make_items()
+    index = PrefixIndex()
+    index.build(items)
+    del items
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    columns = sum(sys.getsizeof(column) for column in (index._names, index._slugs, index._refs, index._ratings))
+    by_ref = sys.getsizeof(index._ref_keys) + sys.getsizeof(index._ref_names)
+    print(f'{NAMES} names: index {memory / 1e6:.0f} MB, of which columns {columns / 1e6:.0f} MB '
+          f'and ref lookup {by_ref / 1e6:.0f} MB, the rest are the strings')
+
+    # timed apart from the memory run, tracing slows allocation down
+    items = make_items()
+    index = PrefixIndex()
+    started = time.perf_counter()
+    index.build(items)
+    print(f'build: {time.perf_counter() - started:.2f} s')
+    del items
+
+    for prefix in ('a', 'ab', 'abc', 'abcd'):
+        rounds = 50
+        started = time.perf_counter()
+        for _ in range(rounds):
+            index.search(prefix, 10)
+        print(f'search {prefix!r:>7}: {(time.perf_counter() - started) / rounds * 1000:.3f} ms')
+
+    rounds = 200
+    started = time.perf_counter()
+    for ref in range(1, rounds + 1):
+        index.add(ref, f'renamed product {ref}', f'renamed-{ref}', 4.0)
+    print(f'update (remove + add): {(time.perf_counter() - started) / rounds * 1000:.3f} ms')
+    started = time.perf_counter()
+    for ref in range(rounds + 1, 2 * rounds + 1):
+        index.remove(ref)
+    print(f'remove: {(time.perf_counter() - started) / rounds * 1000:.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
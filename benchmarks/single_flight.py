@@ -0,0 +1,42 @@
+"""DB query count versus concurrent identical requests, with and without single-flight.
+
+    python benchmarks/single_flight.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.backend.single_flight import SingleFlight
+
+QUERY_TIME = 0.02
+
+
+async def run(concurrency: int, coalesce: bool) -> tuple[int, float]:
+    queries = 0
+
+    async def query():
+        nonlocal queries
+        queries += 1
+        await asyncio.sleep(QUERY_TIME)
+        return {'slug': 'popular-product'}
+
+    flight = SingleFlight()
+    call = (lambda: flight.do(('product_detail', 'popular-product'), query)) if coalesce else query
+    started = time.perf_counter()
+    await asyncio.gather(*[call() for _ in range(concurrency)])
+    return queries, time.perf_counter() - started
+
+
+async def main():
+    print(f'{"concurrent":>10} {"queries (plain)":>16} {"queries (single-flight)":>24} {"wall ms":>8}')
+    for concurrency in (1, 10, 100, 1000, 10000):
+        plain, _ = await run(concurrency, coalesce=False)
+        coalesced, elapsed = await run(concurrency, coalesce=True)
+        print(f'{concurrency:>10} {plain:>16} {coalesced:>24} {elapsed * 1000:>8.1f}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
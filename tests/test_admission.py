@@ -0,0 +1,194 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.backend import admission
+from app.backend.admission import AdmissionMiddleware, apply_statement_timeout, request_budget
+
+QUERY_DELAY = 0.3
+
+
+class SlowDatabase:
+    """Stand-in for a Postgres that has slowed down: a small pool and slow queries."""
+
+    def __init__(self, pool_size: int, delay: float):
+        self.pool = asyncio.Semaphore(pool_size)
+        self.delay = delay
+
+    async def query(self):
+        async with self.pool:
+            await asyncio.sleep(self.delay)
+
+
+class FakeConnection:
+    """The parts of a Postgres connection and its cursor the statement timeout hook uses."""
+
+    dialect = SimpleNamespace(name='postgresql')
+
+    def __init__(self):
+        self.statements = []
+        self.info = {}
+        self.transaction = object()
+
+    def get_transaction(self):
+        return self.transaction
+
+    def execute(self, statement):
+        self.statements.append(statement)
+
+    def run(self, statement):
+        # what the engine does for every statement
+        apply_statement_timeout(self, self, statement, {}, None, False)
+        self.statements.append(statement)
+
+    def timeouts(self) -> list[int]:
+        prefix = 'SET LOCAL statement_timeout = '
+        return [int(statement.removeprefix(prefix)) for statement in self.statements if statement.startswith(prefix)]
+
+
+@pytest.fixture
+def lanes(monkeypatch):
+    monkeypatch.setitem(admission.LANES, 'catalog', 2)
+    monkeypatch.setitem(admission.LANES, 'write', 2)
+    monkeypatch.setitem(admission.LANES, 'auth', 1)
+    monkeypatch.setattr(admission, 'MAX_QUEUE_WAIT', 0.1)
+
+
+def make_app(db: SlowDatabase) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware)
+
+    @app.get('/products/')
+    async def all_products():
+        await db.query()
+        return []
+
+    @app.post('/products/create')
+    async def create_product():
+        await db.query()
+        return {'transaction': 'Successful'}
+
+    return app
+
+
+async def timed(request):
+    started = time.perf_counter()
+    response = await request
+    return response, time.perf_counter() - started
+
+
+def test_saturated_lane_is_shed_while_other_lanes_are_served(lanes):
+    async def main():
+        db = SlowDatabase(pool_size=sum(admission.LANES.values()), delay=QUERY_DELAY)
+        transport = httpx.ASGITransport(app=make_app(db))
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            reads = [asyncio.create_task(client.get('/products/')) for _ in range(10)]
+            await asyncio.sleep(0.05)
+            writes = [asyncio.create_task(timed(client.post('/products/create'))) for _ in range(2)]
+            return await asyncio.gather(*reads), await asyncio.gather(*writes)
+
+    reads, writes = asyncio.run(main())
+    shed = [response for response in reads if response.status_code == 503]
+    assert len([response for response in reads if response.status_code == 200]) == 2
+    assert len(shed) == 8
+    assert all(response.headers['Retry-After'] == str(admission.RETRY_AFTER) for response in shed)
+    for response, elapsed in writes:
+        assert response.status_code == 200
+        # served right away, not queued behind the reads
+        assert elapsed < QUERY_DELAY * 1.8
+
+
+def test_statement_timeout_only_inside_an_admitted_request(lanes):
+    inside, after = FakeConnection(), FakeConnection()
+    leftovers = []
+
+    async def main():
+        app = FastAPI()
+        app.add_middleware(AdmissionMiddleware)
+
+        @app.post('/archive/run')
+        async def start_job():
+            inside.run('SELECT 1')
+
+            async def job():
+                await asyncio.sleep(0.05)
+                after.run('SELECT 1')
+
+            leftovers.append(asyncio.create_task(job()))
+            return {}
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            await client.post('/archive/run')
+        await asyncio.gather(*leftovers)
+
+    asyncio.run(main())
+    assert len(inside.timeouts()) == 1
+    assert after.statements == ['SELECT 1']
+    assert request_budget.get() is None
+
+
+def test_each_statement_is_capped_by_the_remaining_budget(lanes, monkeypatch):
+    monkeypatch.setitem(admission.DEADLINES, 'catalog', 1.0)
+    connection = FakeConnection()
+
+    async def main():
+        app = FastAPI()
+        app.add_middleware(AdmissionMiddleware)
+
+        @app.get('/products/')
+        async def all_products():
+            connection.run('SELECT version')
+            # a quick statement does not need a new timeout
+            connection.run('SELECT category')
+            await asyncio.sleep(QUERY_DELAY)
+            connection.run('SELECT products')
+            return []
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            return await client.get('/products/')
+
+    assert asyncio.run(main()).status_code == 200
+    first, second = connection.timeouts()
+    assert [statement for statement in connection.statements if statement.startswith('SELECT')] == [
+        'SELECT version', 'SELECT category', 'SELECT products']
+    assert 900 < first <= 1000
+    # the second slow statement only gets what the first one left over
+    assert first - QUERY_DELAY * 1000 - 100 < second <= first - QUERY_DELAY * 1000
+
+
+def test_new_transaction_gets_its_own_timeout(lanes):
+    connection = FakeConnection()
+
+    async def main():
+        request_budget.set(admission.RequestBudget(time.monotonic() + 1.0))
+        connection.run('UPDATE products')
+        connection.transaction = object()
+        connection.run('SELECT products')
+
+    asyncio.run(main())
+    assert len(connection.timeouts()) == 2
+
+
+def test_request_past_its_deadline_is_cut_off(lanes, monkeypatch):
+    monkeypatch.setitem(admission.DEADLINES, 'catalog', QUERY_DELAY)
+    db = SlowDatabase(pool_size=1, delay=QUERY_DELAY * 3)
+
+    async def main():
+        transport = httpx.ASGITransport(app=make_app(db))
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            slow = await timed(client.get('/products/'))
+            # the lane slot and the database were given back
+            db.delay = 0
+            return slow, await client.get('/products/')
+
+    (response, elapsed), after = asyncio.run(main())
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(admission.RETRY_AFTER)
+    assert elapsed < QUERY_DELAY * 2
+    assert after.status_code == 200
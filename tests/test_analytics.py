@@ -0,0 +1,121 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.backend import analytics
+from app.models import AnalyticsRefresh
+from app.routers import analytics as analytics_router
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+HORIZON = NOW - timedelta(seconds=2)
+
+
+def compiled(statement) -> tuple[str, dict]:
+    statement = statement.compile(dialect=postgresql.dialect())
+    return ' '.join(str(statement).split()), statement.params
+
+
+class Rows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakeSession:
+    """Answers `scalar` calls in order and records every other statement as compiled SQL."""
+
+    def __init__(self, *scalars, suppliers=(), rows=()):
+        self.scalars_queue = list(scalars)
+        self.suppliers = list(suppliers)
+        self.rows = list(rows)
+        self.executed = []
+        self.added = []
+        self.committed = False
+
+    async def scalar(self, statement):
+        return self.scalars_queue.pop(0)
+
+    async def scalars(self, statement):
+        self.executed.append(compiled(statement))
+        return Rows(self.suppliers)
+
+    async def execute(self, statement):
+        self.executed.append(compiled(statement))
+        return Rows(self.rows)
+
+    def add(self, instance):
+        self.added.append(instance)
+
+    async def commit(self):
+        self.committed = True
+
+
+def test_first_run_rebuilds_everything():
+    db = FakeSession(True, None, NOW, HORIZON)
+
+    assert asyncio.run(analytics.refresh_supplier_stats(db)) is True
+
+    (delete_sql, delete_params), (insert_sql, _) = db.executed
+    assert delete_sql == 'DELETE FROM supplier_category_stats'
+    assert delete_params == {}
+    assert insert_sql.startswith('INSERT INTO supplier_category_stats')
+    assert 'products.supplier_id IN' not in insert_sql
+    state, = db.added
+    assert (state.watermark, state.refreshed_at) == (HORIZON, NOW)
+    assert db.committed
+
+
+def test_incremental_run_redoes_only_changed_suppliers():
+    previous = NOW - timedelta(minutes=1)
+    state = AnalyticsRefresh(id=1, watermark=previous, refreshed_at=previous)
+    db = FakeSession(True, state, NOW, HORIZON, suppliers=[4, 9])
+
+    assert asyncio.run(analytics.refresh_supplier_stats(db)) is True
+
+    (changed_sql, changed_params), (delete_sql, delete_params), (insert_sql, insert_params) = db.executed
+    # changes since the last watermark, up to the rows that are safe to read
+    assert 'products.updated_at >= %(updated_at_1)s AND products.updated_at < %(updated_at_2)s' in changed_sql
+    assert (changed_params['updated_at_1'], changed_params['updated_at_2']) == (previous, HORIZON)
+    assert delete_sql.startswith('DELETE FROM supplier_category_stats WHERE supplier_category_stats.supplier_id IN')
+    assert list(delete_params.values()) == [[4, 9]]
+    assert 'products.supplier_id IN' in insert_sql
+    assert [4, 9] in insert_params.values()
+    assert (state.watermark, state.refreshed_at) == (HORIZON, NOW)
+    assert db.added == []
+    assert db.committed
+
+
+def test_locked_refresh_does_nothing():
+    db = FakeSession(False)
+
+    assert asyncio.run(analytics.refresh_supplier_stats(db)) is False
+    assert db.executed == [] and not db.committed
+
+
+def test_refresh_endpoint_reports_a_running_refresh():
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(analytics_router.refresh_analytics(FakeSession(False), {'is_admin': True}))
+    assert error.value.status_code == 409
+
+
+def test_staleness_is_measured_from_the_watermark():
+    watermark = datetime.now(timezone.utc) - timedelta(seconds=30)
+    db = FakeSession(rows=[(watermark + timedelta(seconds=20), watermark)])
+
+    freshness = asyncio.run(analytics_router.freshness(db))
+
+    assert freshness['watermark'] == watermark
+    assert 30 <= freshness['staleness_seconds'] < 35
+
+
+def test_staleness_before_the_first_refresh():
+    freshness = asyncio.run(analytics_router.freshness(FakeSession()))
+    assert freshness == {'refreshed_at': None, 'watermark': None, 'staleness_seconds': None}
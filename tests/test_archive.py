@@ -0,0 +1,188 @@
+import asyncio
+import os
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.backend import archive
+from app.backend.admission import RequestBudget, request_budget
+from app.backend.db import Base
+from app.routers import archive as archive_router
+
+POSTGRES_DSN = os.environ.get('TEST_POSTGRES_DSN')
+
+
+def compiled(statement) -> tuple[str, dict]:
+    statement = statement.compile(dialect=postgresql.dialect())
+    return ' '.join(str(statement).split()), statement.params
+
+
+class FakeSession:
+    def __init__(self, statements: list, fail_on_execute: bool = False):
+        self.statements = statements
+        self.fail_on_execute = fail_on_execute
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, statement):
+        if self.fail_on_execute:
+            raise ConnectionError('server closed the connection')
+        self.statements.append(compiled(statement))
+
+    async def commit(self):
+        pass
+
+
+class FakeConnection:
+    """The job connection that holds the archive lock."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def rollback(self):
+        self.calls.append('rollback')
+
+    async def execute(self, statement):
+        self.calls.append(compiled(statement)[0])
+
+    async def commit(self):
+        self.calls.append('commit')
+
+    async def invalidate(self):
+        self.calls.append('invalidate')
+
+    async def close(self):
+        self.calls.append('close')
+
+    def released(self) -> bool:
+        return any('pg_advisory_unlock' in call for call in self.calls) and self.calls[-1] == 'close'
+
+
+def fake_sessions(monkeypatch, *sessions):
+    sessions = iter(sessions)
+    monkeypatch.setattr(archive, 'async_session_maker', lambda **kw: next(sessions))
+
+
+async def move_one(db):
+    return 1
+
+
+def test_failed_run_is_recorded_on_a_fresh_session(monkeypatch):
+    statements = []
+    fake_sessions(monkeypatch, FakeSession(statements, fail_on_execute=True), FakeSession(statements))
+    monkeypatch.setattr(archive, 'archive_products_batch', move_one)
+    conn = FakeConnection()
+
+    asyncio.run(archive.run_archive(7, conn))
+
+    (sql, params), = statements
+    assert sql.startswith('UPDATE archive_runs SET finished_at=now(), error=')
+    assert params['id_1'] == 7
+    assert params['error'] == 'server closed the connection'
+    assert conn.released()
+
+
+def test_failure_to_record_does_not_escape_the_task(monkeypatch):
+    fake_sessions(monkeypatch, FakeSession([], fail_on_execute=True), FakeSession([], fail_on_execute=True))
+    monkeypatch.setattr(archive, 'archive_products_batch', move_one)
+    conn = FakeConnection()
+
+    asyncio.run(archive.run_archive(7, conn))
+    assert conn.released()
+
+
+def test_cancelled_run_is_recorded_as_finished(monkeypatch):
+    statements = []
+    fake_sessions(monkeypatch, FakeSession(statements), FakeSession(statements))
+    conn = FakeConnection()
+
+    async def move_forever(db):
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(archive, 'archive_products_batch', move_forever)
+
+    async def main():
+        task = asyncio.create_task(archive.run_archive(7, conn))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    (sql, params), = statements
+    assert sql.startswith('UPDATE archive_runs SET finished_at=now(), error=')
+    assert params['error'] == 'Cancelled'
+    assert conn.released()
+
+
+def test_lock_is_dropped_with_the_connection_if_unlock_fails():
+    class BrokenConnection(FakeConnection):
+        async def execute(self, statement):
+            raise ConnectionError('server closed the connection')
+
+    conn = BrokenConnection()
+    asyncio.run(archive._release(conn))
+    assert conn.calls == ['rollback', 'invalidate', 'close']
+
+
+def test_archive_task_does_not_inherit_the_request_budget(monkeypatch):
+    seen = []
+
+    async def claim_run():
+        return 7, FakeConnection()
+
+    async def run_archive(run_id, conn):
+        seen.append((run_id, request_budget.get()))
+
+    monkeypatch.setattr(archive_router, 'claim_run', claim_run)
+    monkeypatch.setattr(archive_router, 'run_archive', run_archive)
+
+    async def request():
+        request_budget.set(RequestBudget(deadline=0.0))
+        response = await archive_router.start_archive({'is_admin': True})
+        await asyncio.gather(*archive_router.archive_tasks)
+        return response
+
+    response = asyncio.run(request())
+
+    assert response['run_id'] == 7
+    assert seen == [(7, None)]
+
+
+def test_second_run_is_refused_while_one_holds_the_lock(monkeypatch):
+    async def claim_run():
+        return None
+
+    monkeypatch.setattr(archive_router, 'claim_run', claim_run)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(archive_router.start_archive({'is_admin': True}))
+    assert error.value.status_code == 409
+
+
+@pytest.mark.skipif(not POSTGRES_DSN, reason='set TEST_POSTGRES_DSN to run against Postgres')
+def test_only_one_concurrent_claim_wins(monkeypatch):
+    async def main():
+        engine = create_async_engine(make_url(POSTGRES_DSN).set(drivername='postgresql+asyncpg'))
+        monkeypatch.setattr(archive, 'engine', engine)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        try:
+            claims = await asyncio.gather(*[archive.claim_run() for _ in range(5)])
+            won = [claim for claim in claims if claim is not None]
+            assert len(won) == 1
+            await archive._release(won[0][1])
+            # released, the next run may start
+            again = await archive.claim_run()
+            assert again is not None
+            await archive._release(again[1])
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.backend.db import Base
+from app.models import Product
+from app.routers.products import encode_cursor, decode_cursor, product_changes
+
+POSTGRES_DSN = os.environ.get('TEST_POSTGRES_DSN')
+
+
+def test_cursor_round_trip():
+    product = SimpleNamespace(updated_at=datetime(2026, 10, 19, 9, 17, 30, 123456, tzinfo=timezone.utc), id=7)
+    assert decode_cursor(encode_cursor(product)) == (product.updated_at, product.id)
+
+
+@pytest.mark.parametrize('cursor', ['junk', '1_2_3', 'x_1', '99999999999999999999_1'])
+def test_bad_cursor_is_rejected(cursor):
+    with pytest.raises((ValueError, OverflowError)):
+        decode_cursor(cursor)
+
+
+async def insert_product(db, slug: str) -> Product:
+    return await db.scalar(insert(Product).values(name=slug, slug=slug, stock=1, is_active=True)
+                           .returning(Product))
+
+
+@pytest.mark.skipif(not POSTGRES_DSN, reason='set TEST_POSTGRES_DSN to run against Postgres')
+def test_late_commit_still_reaches_the_feed():
+    tag = uuid.uuid4().hex
+
+    async def main():
+        engine = create_async_engine(make_url(POSTGRES_DSN).set(drivername='postgresql+asyncpg'))
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        try:
+            async with sessions() as db:
+                start = await insert_product(db, f'{tag}-start')
+                await db.commit()
+
+            async with sessions() as slow, sessions() as fast, sessions() as reader:
+                # stamped first, committed last
+                await insert_product(slow, f'{tag}-late')
+                await insert_product(fast, f'{tag}-early')
+                await fast.commit()
+
+                first = await product_changes(reader, since=encode_cursor(start), limit=1000)
+                await reader.commit()
+                await slow.commit()
+                second = await product_changes(reader, since=first['next_cursor'], limit=1000)
+            return ([product.slug for product in first['changes'] if product.slug.startswith(tag)],
+                    [product.slug for product in second['changes'] if product.slug.startswith(tag)])
+        finally:
+            await engine.dispose()
+
+    first, second = asyncio.run(main())
+    # nothing newer than the open transaction's stamp goes out while it is open
+    assert first == []
+    assert second == [f'{tag}-late', f'{tag}-early']
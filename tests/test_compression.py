@@ -0,0 +1,90 @@
+import gzip
+
+import pytest
+from starlette.requests import Request
+
+from app.backend.compression import negotiate
+from app.backend.etag import encoded_etag, is_not_modified
+from app.backend.payload_cache import CachedPayload, payload_response
+
+ETAG = '"products-5"'
+
+
+def make_request(**headers) -> Request:
+    return Request({
+        'type': 'http',
+        'method': 'GET',
+        'path': '/products/',
+        'headers': [(name.replace('_', '-').encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+@pytest.mark.parametrize('accept_encoding, expected', [
+    ('gzip, deflate, br', 'br'),
+    ('br;q=0.1, gzip', 'gzip'),
+    ('gzip;q=0.5, br;q=0.8', 'br'),
+    ('br;q=0, gzip', 'gzip'),
+    ('*', 'br'),
+    ('gzip;q=0.2, *;q=0.5', 'br'),
+    ('br;q=0, *', 'gzip'),
+    ('identity, gzip;q=0.5', None),
+    ('*;q=0', None),
+    ('deflate', None),
+    ('', None),
+])
+def test_negotiate_picks_highest_quality(monkeypatch, accept_encoding, expected):
+    # negotiation only checks that brotli is importable
+    monkeypatch.setattr('app.backend.compression.brotli', object())
+    assert negotiate(accept_encoding) == expected
+
+
+def test_negotiate_without_brotli(monkeypatch):
+    monkeypatch.setattr('app.backend.compression.brotli', None)
+    assert negotiate('br, gzip;q=0.5') == 'gzip'
+    assert negotiate('br') is None
+
+
+def test_each_coding_has_its_own_etag():
+    payload = CachedPayload(ETAG, b'[' + b'{"name":"product"},' * 200 + b'{}]')
+
+    plain = payload_response(make_request(), 'all_products', payload)
+    gzipped = payload_response(make_request(accept_encoding='gzip'), 'all_products', payload)
+
+    assert plain.body == payload.body(None) and plain.headers['etag'] == ETAG
+    assert gzip.decompress(gzipped.body) == payload.body(None)
+    assert gzipped.headers['content-encoding'] == 'gzip'
+    assert gzipped.headers['etag'] == '"products-5-gzip"'
+
+
+def test_brotli_variant_has_its_own_etag():
+    brotli = pytest.importorskip('brotli')
+    payload = CachedPayload(ETAG, b'[' + b'{"name":"product"},' * 200 + b'{}]')
+
+    response = payload_response(make_request(accept_encoding='br'), 'all_products', payload)
+
+    assert brotli.decompress(response.body) == payload.body(None)
+    assert response.headers['etag'] == '"products-5-br"'
+
+
+def test_small_body_keeps_the_plain_etag():
+    response = payload_response(make_request(accept_encoding='br'), 'all_products', CachedPayload(ETAG, b'[]'))
+    assert 'content-encoding' not in response.headers
+    assert response.headers['etag'] == ETAG
+
+
+@pytest.mark.parametrize('if_none_match, expected', [
+    (ETAG, ETAG),
+    ('"products-5-gzip"', '"products-5-gzip"'),
+    ('W/"products-5-br"', '"products-5-br"'),
+    ('"products-4-gzip", "products-5-br"', '"products-5-br"'),
+    ('*', ETAG),
+    ('"products-4-gzip"', None),
+    ('"products-5-deflate"', None),
+])
+def test_is_not_modified_matches_coded_tags(if_none_match, expected):
+    assert is_not_modified(make_request(if_none_match=if_none_match), ETAG) == expected
+
+
+def test_is_not_modified_without_header():
+    assert is_not_modified(make_request(), ETAG) is None
+    assert encoded_etag(ETAG, None) == ETAG
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.backend import etag
+from app.backend.invalidation import InvalidationEvent
+from app.routers import products
+
+
+class FakeSession:
+    """Answers `scalar` from a list, `on_scalar` runs while the query is in flight."""
+
+    def __init__(self, *results, on_scalar=None):
+        self.results = list(results)
+        self.on_scalar = on_scalar
+
+    async def scalar(self, statement):
+        if self.on_scalar is not None:
+            await self.on_scalar()
+        return self.results.pop(0)
+
+
+@pytest.fixture(autouse=True)
+def versions(monkeypatch):
+    monkeypatch.setattr(etag, '_versions', {})
+
+
+def make_request(**headers) -> Request:
+    return Request({
+        'type': 'http',
+        'method': 'GET',
+        'path': '/products/detail/missing',
+        'headers': [(name.replace('_', '-').encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_read_does_not_overwrite_a_newer_pushed_version():
+    async def event_arrives():
+        await etag._on_invalidation(InvalidationEvent('products', 7))
+
+    async def scenario():
+        version = await etag.get_table_version(FakeSession(6, on_scalar=event_arrives), 'products')
+        return version, await etag.get_table_version(FakeSession(), 'products')
+
+    assert asyncio.run(scenario()) == (7, 7)
+
+
+def test_read_replaces_an_older_cached_version():
+    etag._versions['products'] = (3, 0.0)
+    assert asyncio.run(etag.get_table_version(FakeSession(4), 'products')) == 4
+
+
+def test_any_etag_does_not_hide_a_missing_product():
+    request = make_request(if_none_match='*')
+    response = asyncio.run(products.product_detail(FakeSession(1, None), 'no-such-product', request))
+
+    assert isinstance(response, HTTPException)
+    assert response.status_code == 404
+
+
+def test_any_etag_matches_an_existing_product():
+    request = make_request(if_none_match='*')
+    product = {'slug': 'existing-product', 'name': 'Existing product'}
+    response = asyncio.run(products.product_detail(FakeSession(1, product), 'existing-product', request))
+
+    assert response.status_code == 304
+    assert response.headers['etag'] == '"products-1"'
+
+
+def test_is_not_modified_star_needs_an_existing_resource():
+    request = make_request(if_none_match='*')
+    assert etag.is_not_modified(request, '"products-1"', exists=False) is None
+    assert etag.is_not_modified(request, '"products-1"') == '"products-1"'
@@ -0,0 +1,35 @@
+from app.backend.prefix_index import PrefixIndex
+
+
+def make_index():
+    index = PrefixIndex()
+    index.build([
+        (1, 'Phone case', 'phone-case', 3.0),
+        (2, 'phone charger', 'phone-charger', 4.5),
+        (3, 'Laptop', 'laptop', 5.0),
+        (-1, 'Phones', 'phones', None),
+    ])
+    return index
+
+
+def test_search_is_case_insensitive_and_ranked_by_rating():
+    results = make_index().search('PHO', limit=2)
+    assert [(result['kind'], result['id']) for result in results] == [('product', 2), ('product', 1)]
+
+
+def test_add_and_remove_keep_index_sorted():
+    index = make_index()
+    index.add(1, 'Tablet', 'tablet', 1.0)
+    index.remove(-1)
+    index.remove(42)
+    assert [result['slug'] for result in index.search('ph')] == ['phone-charger']
+    assert [result['slug'] for result in index.search('t')] == ['tablet']
+    assert len(index) == 3
+
+
+def test_remove_among_duplicate_names():
+    index = PrefixIndex()
+    index.build([(ref, 'Same name', f'same-{ref}', ref) for ref in range(1, 6)])
+    index.remove(3)
+    index.add(6, 'same NAME', 'same-6', 0.5)
+    assert sorted(result['id'] for result in index.search('same', limit=10)) == [1, 2, 4, 5, 6]
@@ -0,0 +1,60 @@
+import asyncio
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.backend.db import Base
+from app.models import Product
+from app.routers.products import product_batch
+from app.schemas import ProductBatch
+
+PRODUCTS = [
+    {'id': 1, 'slug': 'apple', 'stock': 5, 'is_active': True},
+    {'id': 2, 'slug': 'banana', 'stock': 3, 'is_active': True},
+    {'id': 3, 'slug': 'cherry', 'stock': 1, 'is_active': True},
+    {'id': 4, 'slug': 'sold-out', 'stock': 0, 'is_active': True},
+    {'id': 5, 'slug': 'deleted', 'stock': 7, 'is_active': False},
+]
+
+
+def lookup(batch: ProductBatch) -> dict:
+    async def main():
+        engine = create_async_engine('sqlite+aiosqlite://')
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(insert(Product), [{'name': row['slug'], **row} for row in PRODUCTS])
+        try:
+            async with async_sessionmaker(engine)() as db:
+                return await product_batch(db, batch)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def test_results_follow_the_request_order():
+    result = lookup(ProductBatch(slugs=['cherry', 'apple', 'banana'], ids=[3, 1]))
+    assert [product.slug for product in result['slugs']] == ['cherry', 'apple', 'banana']
+    assert [product.id for product in result['ids']] == [3, 1]
+    assert result['missing'] == {'slugs': [], 'ids': []}
+
+
+def test_repeated_refs_are_answered_once():
+    result = lookup(ProductBatch(slugs=['banana', 'apple', 'banana', 'nope', 'nope'], ids=[2, 2, 99, 99]))
+    assert [product.slug for product in result['slugs']] == ['banana', 'apple']
+    assert [product.id for product in result['ids']] == [2]
+    assert result['missing'] == {'slugs': ['nope'], 'ids': [99]}
+
+
+def test_missing_refs_are_reported_per_kind():
+    result = lookup(ProductBatch(slugs=['apple', 'unknown'], ids=[42, 2]))
+    assert [product.slug for product in result['slugs']] == ['apple']
+    assert [product.id for product in result['ids']] == [2]
+    assert result['missing'] == {'slugs': ['unknown'], 'ids': [42]}
+
+
+def test_inactive_and_out_of_stock_products_count_as_missing():
+    result = lookup(ProductBatch(slugs=['sold-out', 'deleted', 'apple'], ids=[4, 5]))
+    assert [product.slug for product in result['slugs']] == ['apple']
+    assert result['ids'] == []
+    assert result['missing'] == {'slugs': ['sold-out', 'deleted'], 'ids': [4, 5]}
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.backend.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return 'row'
+
+    async def main():
+        flight = SingleFlight()
+        return await asyncio.gather(*[flight.do('key', fetch) for _ in range(50)])
+
+    assert asyncio.run(main()) == ['row'] * 50
+    assert calls == 1
+
+
+def test_errors_reach_every_waiter():
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise ValueError('boom')
+
+    async def main():
+        flight = SingleFlight()
+        return await asyncio.gather(*[flight.do('key', fetch) for _ in range(5)], return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(main()))
+
+
+def test_timeout_becomes_504():
+    async def fetch():
+        await asyncio.sleep(1)
+
+    async def main():
+        flight = SingleFlight(timeout=0.05)
+        return await asyncio.gather(*[flight.do('key', fetch) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, HTTPException) and result.status_code == 504 for result in results)
+
+
+def test_cancelled_leader_hands_over_to_follower():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return calls
+
+    async def main():
+        flight = SingleFlight()
+        leader = asyncio.create_task(flight.do('key', fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do('key', fetch))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == 2
+
+
+def test_cancelled_follower_is_cancelled():
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return 'row'
+
+    async def main():
+        flight = SingleFlight()
+        leader = asyncio.create_task(flight.do('key', fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do('key', fetch))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(main()) == 'row'